@@ -1,2 +1,23 @@
 """LLM Guard package"""
-from .evaluate import scan_output, scan_prompt
+import importlib
+
+__all__ = ["scan_output", "scan_prompt"]
+
+# Importing the scanners pulls in the ML dependencies, so they are only loaded on first access.
+_LAZY_ATTRIBUTES = {
+    "scan_output": ".evaluate",
+    "scan_prompt": ".evaluate",
+    "input_scanners": ".input_scanners",
+    "output_scanners": ".output_scanners",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+    if module.__name__ == f"{__name__}.{name}":
+        return module
+
+    return getattr(module, name)
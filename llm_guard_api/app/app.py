@@ -131,6 +131,11 @@ def register_routes(
 
     check_auth = _check_auth_function(config.auth)
 
+    # Config is immutable, so read the settings used on every request once.
+    scan_fail_fast = config.app.scan_fail_fast
+    scan_prompt_timeout = config.app.scan_prompt_timeout
+    scan_output_timeout = config.app.scan_output_timeout
+
     @app.get("/", tags=["Main"])
     @limiter.exempt
     async def read_root():
@@ -170,9 +175,9 @@ def register_routes(
                         output_scanners,
                         request.prompt,
                         request.output,
-                        config.app.scan_fail_fast,
+                        scan_fail_fast,
                     ),
-                    timeout=config.app.scan_output_timeout,
+                    timeout=scan_output_timeout,
                 )
 
                 response = AnalyzeOutputResponse(
@@ -227,9 +232,9 @@ def register_routes(
                         scan_prompt,
                         input_scanners,
                         request.prompt,
-                        config.app.scan_fail_fast,
+                        scan_fail_fast,
                     ),
-                    timeout=config.app.scan_prompt_timeout,
+                    timeout=scan_prompt_timeout,
                 )
 
                 response = AnalyzePromptResponse(
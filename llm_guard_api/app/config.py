@@ -1,52 +1,138 @@
+import concurrent.futures
+import functools
+import logging
 import os
 import re
-from typing import Any, Dict, List, Literal, Optional
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Literal, Optional, Protocol, Tuple
 
 import structlog
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Extra, Field, StrictStr, validator
 
-from llm_guard import input_scanners, output_scanners
-from llm_guard.input_scanners.base import Scanner as InputScanner
-from llm_guard.output_scanners.base import Scanner as OutputScanner
-from llm_guard.vault import Vault
+if TYPE_CHECKING:
+    from llm_guard.input_scanners.base import Scanner as InputScanner
+    from llm_guard.output_scanners.base import Scanner as OutputScanner
+    from llm_guard.vault import Vault
 
-from .util import get_resource_utilization
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
 
 LOGGER = structlog.getLogger(__name__)
 
 _var_matcher = re.compile(r"\${([^}^{]+)}")
-_tag_matcher = re.compile(r"[^$]*\${([^}^{]+)}.*")
 
 
-class RateLimitConfig(BaseModel):
+class _EnvVarTagMatcher:
+    """
+    Implicit resolver matcher for scalars referencing environment variables.
+
+    No other implicit type can contain "${", so a substring check is enough to tag the scalar;
+    the constructor leaves it unchanged if it has no valid ${VAR} reference.
+    """
+
+    @staticmethod
+    def match(value: str) -> bool:
+        return "${" in value
+
+
+_tag_matcher = _EnvVarTagMatcher()
+
+# Scanners that are loaded with ONNX runtime enabled.
+_ONNX_INPUT_SCANNERS = frozenset(
+    {
+        "Anonymize",
+        "BanTopics",
+        "Code",
+        "Language",
+        "PromptInjection",
+        "Toxicity",
+    }
+)
+_ONNX_OUTPUT_SCANNERS = frozenset(
+    {
+        "BanTopics",
+        "Bias",
+        "Code",
+        "FactualConsistency",
+        "Language",
+        "LanguageSame",
+        "MaliciousURLs",
+        "NoRefusal",
+        "Relevance",
+        "Sensitive",
+        "Toxicity",
+    }
+)
+
+# Per-scanner loading policy: (parameter name to inject the vault under, whether to enable ONNX).
+_INPUT_SCANNER_POLICY: Dict[str, Tuple[Optional[str], bool]] = {
+    **{name: (None, True) for name in _ONNX_INPUT_SCANNERS},
+    "Anonymize": ("vault", True),
+}
+_OUTPUT_SCANNER_POLICY: Dict[str, Tuple[Optional[str], bool]] = {
+    **{name: (None, True) for name in _ONNX_OUTPUT_SCANNERS},
+    "Deanonymize": ("vault", False),
+}
+
+# Config loaded by get_config, together with the file name and file identity it was loaded from.
+_CONFIG_SINGLETON: Optional[Tuple[str, Optional[Tuple[int, int, int]], "Config"]] = None
+
+# Loaded scanners keyed by scanner type and frozen parameters, so that models are only loaded once.
+# These caches are unbounded and keep every loaded model alive for the lifetime of the process;
+# the API loads its scanners once at startup, so in practice they only dedupe identical entries.
+_INPUT_SCANNER_CACHE: Dict[Tuple, "InputScanner"] = {}
+_OUTPUT_SCANNER_CACHE: Dict[Tuple, "OutputScanner"] = {}
+_SCANNER_LOCKS: Dict[Tuple, threading.Lock] = {}
+_SCANNER_LOCKS_LOCK = threading.Lock()
+
+
+class _FrozenConfig(BaseModel):
+    """
+    Base for configuration models: immutable, strict about unknown keys and validated only once.
+    """
+
+    class Config:
+        frozen = True
+        extra = Extra.forbid
+        copy_on_model_validation = "none"
+
+
+class RateLimitConfig(_FrozenConfig):
     enabled: bool = Field(default=False)
     limit: str = Field(default="100/minute")
 
 
-class CacheConfig(BaseModel):
+class CacheConfig(_FrozenConfig):
     ttl: int = Field(default=60)
     max_size: Optional[int] = Field(default=None)
 
 
-class AuthConfig(BaseModel):
+class AuthConfig(_FrozenConfig):
     type: Literal["http_bearer", "http_basic"] = Field()
     token: Optional[str] = Field(default=None)
     username: Optional[str] = Field(default=None)
     password: Optional[str] = Field(default=None)
 
 
-class TracingConfig(BaseModel):
+class TracingConfig(_FrozenConfig):
     exporter: Literal["otel_http", "console"] = Field(default="console")
     endpoint: Optional[str] = Field(default=None)
 
 
-class MetricsConfig(BaseModel):
+class MetricsConfig(_FrozenConfig):
     exporter: Literal["otel_http", "prometheus", "console"] = Field(default="console")
     endpoint: Optional[str] = Field(default=None)
 
 
-class AppConfig(BaseModel):
+class AppConfig(_FrozenConfig):
     name: Optional[str] = Field(default="LLM Guard API")
     port: Optional[int] = Field(default=8000)
     log_level: Optional[str] = Field(default="INFO")
@@ -55,14 +141,63 @@ class AppConfig(BaseModel):
     scan_output_timeout: Optional[int] = Field(default=30)
 
 
-class ScannerConfig(BaseModel):
+class ScannerConfigLike(Protocol):
+    """
+    Interface shared by `ScannerConfig` and, when msgspec is installed, `ScannerConfigStruct`.
+    """
+
     type: str
+    params: Optional[Dict]
+
+
+class ScannerConfig(_FrozenConfig):
+    # Keep in sync with `ScannerConfigStruct`: both accept and reject the same configs, whether
+    # msgspec is installed or not (only the error messages differ).
+    type: StrictStr
     params: Optional[Dict] = Field(default_factory=dict)
 
+    @validator("params", pre=True, allow_reuse=True)
+    def _params_is_mapping(cls, value: Any) -> Any:
+        if value is not None and not isinstance(value, dict):
+            raise TypeError("value is not a valid dict")
+
+        return value
+
+
+if msgspec is not None:
+
+    class ScannerConfigStruct(msgspec.Struct, frozen=True, forbid_unknown_fields=True):
+        """
+        `ScannerConfig` counterpart validated by msgspec, used when it is installed.
+        """
+
+        type: str
+        params: Optional[Dict] = {}
+
+    class ScannerConfigList(list):
+        """
+        List of scanner configurations, converted by msgspec in a single pass.
+        """
+
+        @classmethod
+        def __get_validators__(cls):
+            yield cls.validate
+
+        @classmethod
+        def validate(cls, value: Any) -> List[ScannerConfigStruct]:
+            try:
+                return msgspec.convert(value, List[ScannerConfigStruct])
+            except msgspec.ValidationError as exc:
+                raise ValueError(str(exc)) from exc
+
+    _ScannerConfigs = ScannerConfigList
+else:
+    _ScannerConfigs = List[ScannerConfig]
+
 
-class Config(BaseModel):
-    input_scanners: List[ScannerConfig] = Field()
-    output_scanners: List[ScannerConfig] = Field()
+class Config(_FrozenConfig):
+    input_scanners: _ScannerConfigs = Field()
+    output_scanners: _ScannerConfigs = Field()
     rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
     cache: CacheConfig = Field(default_factory=CacheConfig)
     auth: Optional[AuthConfig] = Field(default=None)
@@ -71,121 +206,222 @@ class Config(BaseModel):
     metrics: Optional[MetricsConfig] = Field(default=None)
 
 
+@functools.lru_cache(maxsize=512)
+def _resolve_envvars(value: str) -> str:
+    """
+    Substitute ${VAR} and ${VAR:default} references in a scalar with environment variable values.
+
+    The environment is not expected to change during the process lifetime, so results are cached.
+    """
+    parts = []
+    last = 0
+    for match in _var_matcher.finditer(value):
+        parts.append(value[last : match.start()])
+        name, _, default = match.group(1).partition(":")
+        parts.append(os.environ.get(name, default))
+        last = match.end()
+    parts.append(value[last:])
+
+    return "".join(parts)
+
+
 def _path_constructor(_loader: Any, node: Any):
-    def replace_fn(match):
-        envparts = f"{match.group(1)}:".split(":")
-        return os.environ.get(envparts[0], envparts[1])
+    return _resolve_envvars(node.value)
+
+
+class _ConfigLoader(SafeLoader):
+    """
+    YAML loader that returns a validated `Config` model instead of the document's mapping.
+
+    The mapping is still fully constructed first and then validated by `Config.parse_obj`; this
+    only saves the separate loading step, it is not a single-pass parse into the models.
+    """
+
+    def construct_document(self, node: Any) -> Optional[Config]:
+        conf = super().construct_document(node)
+        if not conf:
+            return None
+
+        return Config.parse_obj(conf)
+
 
-    return _var_matcher.sub(replace_fn, node.value)
+# Registered on the config loader only, so other YAML loaders and dumpers in the process are
+# not affected.
+_ConfigLoader.add_implicit_resolver("!envvar", _tag_matcher, None)
+_ConfigLoader.add_constructor("!envvar", _path_constructor)
 
 
-def load_yaml(filename: str) -> dict:
-    yaml.add_implicit_resolver("!envvar", _tag_matcher, None, yaml.SafeLoader)
-    yaml.add_constructor("!envvar", _path_constructor, yaml.SafeLoader)
+def _load_config(file_name: str) -> Optional[Config]:
     try:
-        with open(filename, "r") as f:
-            return yaml.safe_load(f.read())
+        with open(file_name, "rb") as f:
+            return yaml.load(f, Loader=_ConfigLoader)
     except (FileNotFoundError, PermissionError, yaml.YAMLError) as exc:
         LOGGER.error("Error loading YAML file", exception=exc)
-        return dict()
+        return None
 
 
 def get_config(file_name: str) -> Optional[Config]:
+    """
+    Load the configuration file.
+
+    The loaded config is kept for the lifetime of the process and only reloaded when the file's
+    inode, mtime or size changes, so calling this before forking workers (e.g. with `--preload`)
+    lets them share it instead of parsing it again.
+    """
+    global _CONFIG_SINGLETON
+
+    # The size and inode catch files replaced with their mtime preserved (e.g. `cp -p`, `rsync -t`)
+    # or on filesystems with coarse timestamps.
+    try:
+        stat = os.stat(file_name)
+        file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        file_id = None
+
+    if _CONFIG_SINGLETON is not None and _CONFIG_SINGLETON[:2] == (file_name, file_id):
+        return _CONFIG_SINGLETON[2]
+
     LOGGER.debug("Loading config file", file_name=file_name)
 
-    conf = load_yaml(file_name)
-    if conf == {}:
-        return None
+    config = _load_config(file_name)
+    if config is not None:
+        _CONFIG_SINGLETON = (file_name, file_id, config)
 
-    return Config(**conf)
+    return config
 
 
-def get_input_scanners(scanners: List[ScannerConfig], vault: Vault) -> List[InputScanner]:
+def get_input_scanners(scanners: List[ScannerConfigLike], vault: "Vault") -> List["InputScanner"]:
     """
     Load input scanners from the configuration file.
-    """
-    input_scanners_loaded = []
-    for scanner in scanners:
-        LOGGER.debug("Loading input scanner", scanner=scanner.type, **get_resource_utilization())
-        input_scanners_loaded.append(
-            _get_input_scanner(
-                scanner.type,
-                scanner.params,
-                vault=vault,
-            )
-        )
 
-    return input_scanners_loaded
+    Scanners are loaded concurrently, and the returned list preserves the configured order.
+    """
+    return _load_scanners("input", scanners, vault, _get_input_scanner)
 
 
-def get_output_scanners(scanners: List[ScannerConfig], vault: Vault) -> List[OutputScanner]:
+def get_output_scanners(scanners: List[ScannerConfigLike], vault: "Vault") -> List["OutputScanner"]:
     """
     Load output scanners from the configuration file.
+
+    Scanners are loaded concurrently, and the returned list preserves the configured order.
     """
-    output_scanners_loaded = []
-    for scanner in scanners:
-        LOGGER.debug("Loading output scanner", scanner=scanner.type, **get_resource_utilization())
-        output_scanners_loaded.append(
-            _get_output_scanner(
-                scanner.type,
-                scanner.params,
-                vault=vault,
+    return _load_scanners("output", scanners, vault, _get_output_scanner)
+
+
+def _load_scanners(
+    kind: str,
+    scanners: List[ScannerConfigLike],
+    vault: "Vault",
+    get_scanner: Callable[..., Any],
+) -> list:
+    if not scanners:
+        return []
+
+    # Collecting resource utilization reads from /proc, so only do it when it will be logged.
+    debug_enabled = logging.getLogger(__name__).isEnabledFor(logging.DEBUG)
+
+    def load(scanner: ScannerConfigLike):
+        if debug_enabled:
+            LOGGER.debug(f"Loading {kind} scanner", scanner=scanner.type)
+
+        loaded = get_scanner(scanner.type, scanner.params, vault=vault)
+
+        if debug_enabled:
+            from .util import get_resource_utilization
+
+            LOGGER.debug(
+                f"Loaded {kind} scanner", scanner=scanner.type, **get_resource_utilization()
             )
-        )
 
-    return output_scanners_loaded
+        return loaded
 
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(scanners))) as executor:
+        return list(executor.map(load, scanners))
 
-def _get_input_scanner(
+
+def _freeze(value: Any) -> Any:
+    """
+    Recursively convert scanner parameters into a hashable cache key.
+
+    Containers and scalars are tagged with their type, so that e.g. a dict and a list of pairs,
+    or `True` and `1`, produce different keys.
+    """
+    if isinstance(value, dict):
+        return "dict", frozenset((_freeze(k), _freeze(v)) for k, v in value.items())
+
+    if isinstance(value, (list, tuple)):
+        return type(value).__name__, tuple(_freeze(v) for v in value)
+
+    if isinstance(value, (set, frozenset)):
+        return "set", frozenset(_freeze(v) for v in value)
+
+    return type(value), value
+
+
+def _get_scanner(
     scanner_name: str,
     scanner_config: Optional[Dict],
     *,
-    vault: Vault,
+    vault: "Vault",
+    policy: Dict[str, Tuple[Optional[str], bool]],
+    cache: Dict[Tuple, Any],
+    get_scanner_by_name: Callable[[str, Optional[Dict]], Any],
 ):
-    if scanner_config is None:
-        scanner_config = {}
+    vault_key, use_onnx = policy.get(scanner_name, (None, False))
 
-    if scanner_name == "Anonymize":
-        scanner_config["vault"] = vault
+    # Copy the parameters so the shared configuration model is never mutated.
+    scanner_config = dict(scanner_config) if scanner_config else {}
+    if vault_key:
+        scanner_config[vault_key] = vault
 
-    if scanner_name in [
-        "Anonymize",
-        "BanTopics",
-        "Code",
-        "Language",
-        "PromptInjection",
-        "Toxicity",
-    ]:
+    if use_onnx:
         scanner_config["use_onnx"] = True
 
-    return input_scanners.get_scanner_by_name(scanner_name, scanner_config)
+    key = (scanner_name, _freeze(scanner_config))
 
+    # Scanners are loaded from several threads; a per-key lock keeps identical entries from
+    # loading the same model twice while different scanners still load in parallel.
+    with _SCANNER_LOCKS_LOCK:
+        lock = _SCANNER_LOCKS.setdefault(key, threading.Lock())
 
-def _get_output_scanner(
+    with lock:
+        if key not in cache:
+            cache[key] = get_scanner_by_name(scanner_name, scanner_config)
+
+    return cache[key]
+
+
+def _get_input_scanner(
     scanner_name: str,
     scanner_config: Optional[Dict],
     *,
-    vault: Vault,
-):
-    if scanner_config is None:
-        scanner_config = {}
+    vault: "Vault",
+) -> "InputScanner":
+    from llm_guard import input_scanners
 
-    if scanner_name == "Deanonymize":
-        scanner_config["vault"] = vault
+    return _get_scanner(
+        scanner_name,
+        scanner_config,
+        vault=vault,
+        policy=_INPUT_SCANNER_POLICY,
+        cache=_INPUT_SCANNER_CACHE,
+        get_scanner_by_name=input_scanners.get_scanner_by_name,
+    )
 
-    if scanner_name in [
-        "BanTopics",
-        "Bias",
-        "Code",
-        "FactualConsistency",
-        "Language",
-        "LanguageSame",
-        "MaliciousURLs",
-        "NoRefusal",
-        "Relevance",
-        "Sensitive",
-        "Toxicity",
-    ]:
-        scanner_config["use_onnx"] = True
 
-    return output_scanners.get_scanner_by_name(scanner_name, scanner_config)
+def _get_output_scanner(
+    scanner_name: str,
+    scanner_config: Optional[Dict],
+    *,
+    vault: "Vault",
+) -> "OutputScanner":
+    from llm_guard import output_scanners
+
+    return _get_scanner(
+        scanner_name,
+        scanner_config,
+        vault=vault,
+        policy=_OUTPUT_SCANNER_POLICY,
+        cache=_OUTPUT_SCANNER_CACHE,
+        get_scanner_by_name=output_scanners.get_scanner_by_name,
+    )
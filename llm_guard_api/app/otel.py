@@ -1,42 +1,90 @@
+import os
+from typing import TYPE_CHECKING, Dict
+
 from fastapi import FastAPI
 from opentelemetry import metrics, trace
-from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.exporter.prometheus import PrometheusMetricReader
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
-from opentelemetry.sdk.resources import SERVICE_NAME, SERVICE_VERSION, Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
 
 from .config import MetricsConfig, TracingConfig
 from .version import __version__
 
+if TYPE_CHECKING:
+    from opentelemetry.sdk.resources import Resource
+
+# Larger batches than the SDK defaults mean fewer export requests under sustained traffic.
+_BSP_MAX_QUEUE_SIZE = 8192
+_BSP_MAX_EXPORT_BATCH_SIZE = 2048
+_BSP_SCHEDULE_DELAY_MILLIS = 10000
+# Queue size the SDK falls back to when OTEL_BSP_MAX_QUEUE_SIZE is malformed.
+_SDK_DEFAULT_MAX_QUEUE_SIZE = 2048
+
+
+def _span_processor_kwargs() -> Dict[str, int]:
+    """
+    Tuned BatchSpanProcessor arguments for the OTEL_BSP_* settings that are not set.
+
+    Settings present in the environment are left to the SDK, which parses them itself.
+    """
+    kwargs = {}
+    if "OTEL_BSP_MAX_QUEUE_SIZE" not in os.environ:
+        kwargs["max_queue_size"] = _BSP_MAX_QUEUE_SIZE
 
-def _configure_tracing(tracing_config: TracingConfig, resource: Resource) -> None:
-    trace.set_tracer_provider(TracerProvider(resource=resource))
+    if "OTEL_BSP_SCHEDULE_DELAY" not in os.environ:
+        kwargs["schedule_delay_millis"] = _BSP_SCHEDULE_DELAY_MILLIS
 
+    if "OTEL_BSP_MAX_EXPORT_BATCH_SIZE" not in os.environ:
+        max_queue_size = kwargs.get("max_queue_size")
+        if max_queue_size is None:
+            try:
+                max_queue_size = int(os.environ["OTEL_BSP_MAX_QUEUE_SIZE"])
+            except ValueError:
+                max_queue_size = _SDK_DEFAULT_MAX_QUEUE_SIZE
+
+        # The SDK rejects batches larger than the queue.
+        kwargs["max_export_batch_size"] = min(_BSP_MAX_EXPORT_BATCH_SIZE, max_queue_size)
+
+    return kwargs
+
+
+def _configure_tracing(tracing_config: TracingConfig, resource: "Resource") -> None:
     if tracing_config is None:
         return
 
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
     if tracing_config.exporter == "otel_http":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
         exporter = OTLPSpanExporter(endpoint=tracing_config.endpoint)
     elif tracing_config.exporter == "console":
         exporter = ConsoleSpanExporter()
 
-    trace.get_tracer_provider().add_span_processor(BatchSpanProcessor(exporter))
+    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider.add_span_processor(BatchSpanProcessor(exporter, **_span_processor_kwargs()))
+    trace.set_tracer_provider(tracer_provider)
 
 
-def _configure_metrics(metrics_config: MetricsConfig, resource: Resource) -> None:
+def _configure_metrics(metrics_config: MetricsConfig, resource: "Resource") -> None:
     if metrics_config is None:
         return
 
+    from opentelemetry.sdk.metrics import MeterProvider
+
     if metrics_config.exporter == "console":
+        from opentelemetry.sdk.metrics.export import (
+            ConsoleMetricExporter,
+            PeriodicExportingMetricReader,
+        )
+
         reader = PeriodicExportingMetricReader(ConsoleMetricExporter())
     elif metrics_config.exporter == "otel_http":
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+
         reader = PeriodicExportingMetricReader(OTLPMetricExporter(endpoint=metrics_config.endpoint))
     elif metrics_config.exporter == "prometheus":
+        from opentelemetry.exporter.prometheus import PrometheusMetricReader
+
         reader = PrometheusMetricReader()
 
     meter_provider = MeterProvider(resource=resource, metric_readers=[reader])
@@ -46,6 +94,11 @@ def _configure_metrics(metrics_config: MetricsConfig, resource: Resource) -> Non
 def instrument_app(
     app: FastAPI, app_name: str, tracing_config: TracingConfig, metrics_config: MetricsConfig
 ) -> None:
+    if tracing_config is None and metrics_config is None:
+        return
+
+    from opentelemetry.sdk.resources import SERVICE_NAME, SERVICE_VERSION, Resource
+
     resource = Resource(
         attributes={
             SERVICE_NAME: app_name,
@@ -56,9 +109,13 @@ def instrument_app(
     _configure_tracing(tracing_config, resource)
     _configure_metrics(metrics_config, resource)
 
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    # The instrumentation records the HTTP request metrics. Without tracing no SDK tracer provider
+    # is installed, so the spans it creates are non-recording and cheap.
     FastAPIInstrumentor.instrument_app(
         app,
         excluded_urls="healtz,readyz,metrics",
         meter_provider=metrics.get_meter_provider(),
-        tracer_provider=trace.get_tracer_provider(),
+        tracer_provider=trace.get_tracer_provider() if tracing_config is not None else None,
     )
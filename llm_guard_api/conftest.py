@@ -0,0 +1 @@
+# Makes the `app` package importable when running the API tests from the repository root.
@@ -0,0 +1,194 @@
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("yaml")
+
+from app import config  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "first,second",
+    [
+        ({"a": {"b": 1}}, {"a": [["b", 1]]}),  # dict vs list of pairs
+        ({"a": True}, {"a": 1}),  # bool vs int
+        ({"a": 1}, {"a": 1.0}),  # int vs float
+        ({"a": [1, 2]}, {"a": (1, 2)}),  # list vs tuple
+        ({"a": [1, 2]}, {"a": {1, 2}}),  # list vs set
+        ({"a": "1"}, {"a": 1}),  # str vs int
+    ],
+)
+def test_freeze_distinguishes_types(first, second):
+    assert config._freeze(first) != config._freeze(second)
+
+
+@pytest.mark.parametrize(
+    "first,second",
+    [
+        ({"a": 1, "b": 2}, {"b": 2, "a": 1}),  # key order
+        ({"a": {1, 2}}, {"a": {2, 1}}),  # set order
+    ],
+)
+def test_freeze_ignores_ordering(first, second):
+    assert config._freeze(first) == config._freeze(second)
+
+
+def test_freeze_is_hashable():
+    hash(config._freeze({"a": {1, 2}, 3: [{"b": None}], "c": (1.5, "x")}))
+
+
+def _get_scanner(get_scanner_by_name, scanner_name, scanner_config, cache, vault=None):
+    return config._get_scanner(
+        scanner_name,
+        scanner_config,
+        vault=vault,
+        policy={"Anonymize": ("vault", True), "Toxicity": (None, True)},
+        cache=cache,
+        get_scanner_by_name=get_scanner_by_name,
+    )
+
+
+def test_get_scanner_reuses_cached_instances():
+    calls = []
+
+    def get_scanner_by_name(name, scanner_config):
+        calls.append((name, scanner_config))
+        return object()
+
+    cache = {}
+    first = _get_scanner(get_scanner_by_name, "Toxicity", {"threshold": 0.5}, cache)
+    second = _get_scanner(get_scanner_by_name, "Toxicity", {"threshold": 0.5}, cache)
+    other = _get_scanner(get_scanner_by_name, "Toxicity", {"threshold": 0.7}, cache)
+
+    assert first is second
+    assert other is not first
+    assert calls == [
+        ("Toxicity", {"threshold": 0.5, "use_onnx": True}),
+        ("Toxicity", {"threshold": 0.7, "use_onnx": True}),
+    ]
+
+
+def test_get_scanner_keys_on_vault_and_does_not_mutate_params():
+    def get_scanner_by_name(name, scanner_config):
+        return object()
+
+    cache = {}
+    params = {"use_faker": False}
+    first = _get_scanner(get_scanner_by_name, "Anonymize", params, cache, vault=object())
+    second = _get_scanner(get_scanner_by_name, "Anonymize", params, cache, vault=object())
+
+    assert first is not second
+    assert params == {"use_faker": False}
+
+
+def test_get_config_substitutes_env_vars(tmp_path, monkeypatch):
+    monkeypatch.setenv("TEST_CONFIG_RATE_LIMIT", "7/second")
+    path = tmp_path / "scanners.yml"
+    path.write_text(
+        "rate_limit:\n"
+        "  limit: ${TEST_CONFIG_RATE_LIMIT}\n"
+        "app:\n"
+        "  name: api-${TEST_CONFIG_MISSING:default}\n"
+        "input_scanners: []\n"
+        "output_scanners: []\n"
+    )
+
+    conf = config.get_config(str(path))
+
+    assert conf.rate_limit.limit == "7/second"
+    assert conf.app.name == "api-default"
+
+
+def test_env_var_resolver_is_scoped_to_config_loader(monkeypatch):
+    import yaml
+
+    monkeypatch.setenv("TEST_CONFIG_SCOPED", "value")
+
+    assert yaml.safe_load("a: ${TEST_CONFIG_SCOPED}") == {"a": "${TEST_CONFIG_SCOPED}"}
+    assert yaml.dump({"a": "${TEST_CONFIG_SCOPED}"}) == "a: ${TEST_CONFIG_SCOPED}\n"
+
+
+def test_get_config_reloads_file_replaced_with_same_mtime(tmp_path):
+    import os
+
+    path = tmp_path / "scanners.yml"
+    path.write_text("app:\n  port: 1\ninput_scanners: []\noutput_scanners: []\n")
+    stat = os.stat(path)
+
+    assert config.get_config(str(path)).app.port == 1
+    assert config.get_config(str(path)) is config.get_config(str(path))
+
+    path.write_text("app:\n  port: 1234\ninput_scanners: []\noutput_scanners: []\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert config.get_config(str(path)).app.port == 1234
+
+
+@pytest.fixture(params=["msgspec", "pydantic"])
+def config_module(request, monkeypatch):
+    """
+    Reloads the config module with and without msgspec available.
+    """
+    import importlib
+    import sys
+
+    if request.param == "msgspec":
+        pytest.importorskip("msgspec")
+    else:
+        monkeypatch.setitem(sys.modules, "msgspec", None)
+
+    module = importlib.reload(config)
+    assert (module.msgspec is None) == (request.param == "pydantic")
+
+    yield module
+
+    monkeypatch.undo()
+    importlib.reload(config)
+
+
+def _scanners_config(scanners):
+    return {"input_scanners": scanners, "output_scanners": []}
+
+
+@pytest.mark.parametrize(
+    "scanners,expected",
+    [
+        ([], []),
+        ([{"type": "Toxicity"}], [("Toxicity", {})]),
+        ([{"type": "Regex", "params": None}], [("Regex", None)]),
+        (
+            [{"type": "BanTopics", "params": {"topics": ["violence"], "threshold": 0.5}}],
+            [("BanTopics", {"topics": ["violence"], "threshold": 0.5})],
+        ),
+    ],
+)
+def test_scanner_configs_accepted(config_module, scanners, expected):
+    conf = config_module.Config.parse_obj(_scanners_config(scanners))
+
+    assert [(scanner.type, scanner.params) for scanner in conf.input_scanners] == expected
+
+
+@pytest.mark.parametrize(
+    "scanners",
+    [
+        None,  # not a list
+        [{"params": {}}],  # missing type
+        [{"type": 123}],  # non-string type
+        [{"type": "Regex", "params": []}],  # non-mapping params
+        [{"type": "Regex", "unknown": 1}],  # unknown key
+    ],
+)
+def test_scanner_configs_rejected(config_module, scanners):
+    from pydantic import ValidationError
+
+    with pytest.raises(ValidationError):
+        config_module.Config.parse_obj(_scanners_config(scanners))
+
+
+def test_scanner_config_error_includes_index(config_module):
+    from pydantic import ValidationError
+
+    with pytest.raises(ValidationError) as exc_info:
+        config_module.Config.parse_obj(_scanners_config([{"type": "A"}, {"type": 1}]))
+
+    message = str(exc_info.value)
+    assert "input_scanners -> 1 -> type" in message or "$[1].type" in message